@@ -1,13 +1,19 @@
 import os
 from .model_info import retrieve_model_info, calculate_model_pricing
-from .usage import retrieve_key_usage_details
+from .usage import retrieve_key_usage_details, KEY_USAGE_TTL
+from .export import export_usage_logs, read_last_exported_at
+from .statistics import UsageStatistics
 from utils.logger import Logger
 
 
 __all__ = [
     'retrieve_model_info',
     'calculate_model_pricing',
-    'retrieve_key_usage_details'
+    'retrieve_key_usage_details',
+    'KEY_USAGE_TTL',
+    'export_usage_logs',
+    'read_last_exported_at',
+    'UsageStatistics'
 ]
 
 # Get the package name based on the directory name
@@ -0,0 +1,76 @@
+import os, sys, time, argparse
+import psutil
+import pyarrow as pa
+from datetime import date
+from utils import Logger
+from .report import read_report_jobs, generate_usage_report, REPORT_FORMATS
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+# Startup is timed from process creation, since `python -m backend.usage` imports the package before this module runs
+_started = psutil.Process().create_time()
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+
+    """
+    parser = argparse.ArgumentParser(prog='python -m backend.usage', description="Headless API usage tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report_parser = subparsers.add_parser('report', help="Write per-key usage summaries for a list of API keys.")
+    report_parser.add_argument('jobs_file', help="JSON file listing the API keys and date ranges to report on.")
+    report_parser.add_argument('-o', '--output', help="Report file path. Defaults to reports/usage_report_<date>.<format>.")
+    report_parser.add_argument('-f', '--format', choices=REPORT_FORMATS, default='json', help="Report format. Defaults to json.")
+    report_parser.add_argument('-w', '--workers', type=int, default=8, help="Number of keys fetched concurrently. Defaults to 8.")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        int: The process exit code, 0 on success, 1 if some keys failed, 2 for an invalid
+            job file and 3 if the report could not be written.
+
+    """
+    args = _parse_args(argv)
+    logger.info(f"Startup completed in {time.time() - _started:.3f}s.")
+
+    if args.command == 'report':
+        output_path = args.output or os.path.join('reports', f'usage_report_{date.today().isoformat()}.{args.format}')
+        try:
+            jobs = read_report_jobs(args.jobs_file)
+        except ValueError as e:
+            logger.error(e)
+            return 2
+
+        try:
+            summaries = generate_usage_report(jobs, output_path, report_format=args.format, max_workers=args.workers)
+        except (OSError, pa.ArrowException) as e:
+            logger.error(f"Unable to write usage report to {output_path}: {e}")
+            return 3
+
+        failed = sum('error' in summary for summary in summaries)
+        logger.info(f"{len(summaries) - failed} of {len(summaries)} keys reported in {time.time() - _started:.3f}s.")
+        return 1 if failed else 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import os, csv, gzip, io
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Union, BinaryIO
+from utils import Logger
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+# Export schema, shared by the Parquet and CSV writers
+USAGE_LOG_SCHEMA = pa.schema([
+    ('created_at', pa.timestamp('s', tz='UTC')),
+    ('token_name', pa.string()),
+    ('model_name', pa.string()),
+    ('use_time', pa.int32()),
+    ('prompt_tokens', pa.int64()),
+    ('completion_tokens', pa.int64()),
+    ('quota', pa.int64()),
+    ('total_costs', pa.float64())
+])
+
+EXPORT_FORMATS = ('parquet', 'csv')
+QUOTA_TO_USD = 2e-6
+
+
+def _iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Splits an iterable of log records into lists of at most chunk_size records.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): The log records to split.
+        chunk_size (int): The maximum number of records per chunk.
+
+    Yields:
+        List[Dict[str, Any]]: The next chunk of records.
+
+    """
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+def _to_record_batch(chunk: List[Dict[str, Any]]) -> pa.RecordBatch:
+    """
+    Converts a chunk of raw log records into a typed record batch.
+
+    Args:
+        chunk (List[Dict[str, Any]]): The raw log records returned by the request log endpoint.
+
+    Returns:
+        pa.RecordBatch: The records laid out according to USAGE_LOG_SCHEMA.
+
+    """
+    columns = {
+        'created_at': [r.get('created_at') for r in chunk],
+        'token_name': [r.get('token_name') for r in chunk],
+        'model_name': [r.get('model_name') for r in chunk],
+        'use_time': [r.get('use_time') for r in chunk],
+        'prompt_tokens': [r.get('prompt_tokens') for r in chunk],
+        'completion_tokens': [r.get('completion_tokens') for r in chunk],
+        'quota': [r.get('quota') for r in chunk]
+    }
+    columns['total_costs'] = [q * QUOTA_TO_USD if q is not None else None for q in columns['quota']]
+    return pa.RecordBatch.from_pydict(columns, schema=USAGE_LOG_SCHEMA)
+
+def _write_parquet(chunks: Iterator[List[Dict[str, Any]]], destination: Union[str, BinaryIO]) -> int:
+    """
+    Writes chunks of log records to a Parquet file, one row group per chunk.
+
+    Args:
+        chunks (Iterator[List[Dict[str, Any]]]): The chunks of log records to write.
+        destination (Union[str, BinaryIO]): The output file path or a writable binary file object.
+
+    Returns:
+        int: The number of records written.
+
+    """
+    written = 0
+    with pq.ParquetWriter(destination, USAGE_LOG_SCHEMA, compression='snappy') as writer:
+        for chunk in chunks:
+            writer.write_batch(_to_record_batch(chunk))
+            written += len(chunk)
+    return written
+
+def _write_csv(chunks: Iterator[List[Dict[str, Any]]], destination: Union[str, BinaryIO], append: bool) -> int:
+    """
+    Writes chunks of log records to a gzip compressed CSV file.
+
+    Args:
+        chunks (Iterator[List[Dict[str, Any]]]): The chunks of log records to write.
+        destination (Union[str, BinaryIO]): The output file path or a writable binary file object.
+        append (bool): Whether to append to an existing export rather than overwrite it.
+
+    Returns:
+        int: The number of records written.
+
+    """
+    written = 0
+    mode = 'ab' if append else 'wb'
+    write_header = not append
+
+    if isinstance(destination, str):
+        # Appending to an existing export adds a new gzip member, which readers concatenate transparently
+        write_header = not (append and os.path.exists(destination) and os.path.getsize(destination) > 0)
+        gzip_file = gzip.open(destination, mode)
+    else:
+        write_header = not append or destination.tell() == 0
+        gzip_file = gzip.GzipFile(fileobj=destination, mode=mode)
+
+    with gzip_file, io.TextIOWrapper(gzip_file, encoding='utf-8', newline='') as text_file:
+        writer = csv.writer(text_file)
+        if write_header:
+            writer.writerow(USAGE_LOG_SCHEMA.names)
+        for chunk in chunks:
+            batch = _to_record_batch(chunk)
+            created_at = [
+                datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if ts is not None else None
+                for ts in batch.column('created_at').cast(pa.int64()).to_pylist()
+            ]
+            writer.writerows(zip(created_at, *(batch.column(i).to_pylist() for i in range(1, batch.num_columns))))
+            written += len(chunk)
+    return written
+
+def _parquet_last_created_at(file_path: str) -> Optional[int]:
+    """
+    Reads the latest `created_at` timestamp from a single Parquet export, one batch at a time.
+
+    Args:
+        file_path (str): The path to the Parquet file.
+
+    Returns:
+        Optional[int]: The latest `created_at` as a unix timestamp, or None if the file has no records.
+
+    """
+    last_created_at = None
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(columns=['created_at']):
+        # Parquet has no second resolution timestamps, so the column is read back in milliseconds
+        created_at = batch.column(0).cast(USAGE_LOG_SCHEMA.field('created_at').type).cast(pa.int64())
+        batch_max = pc.max(created_at).as_py()
+        if batch_max is not None and (last_created_at is None or batch_max > last_created_at):
+            last_created_at = batch_max
+    return last_created_at
+
+def read_last_exported_at(file_path: str, file_format: str = 'parquet') -> Optional[int]:
+    """
+    Reads the latest `created_at` timestamp from a previous export, to be used as the resume point.
+
+    Args:
+        file_path (str): The path to the previous export. For Parquet, this may be a dataset directory,
+            in which case every part file in it is considered.
+        file_format (str, optional): The export format, either 'parquet' or 'csv'. Defaults to 'parquet'.
+
+    Returns:
+        Optional[int]: The latest exported `created_at` as a unix timestamp, or None if nothing has been exported.
+
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    last_exported_at = None
+    if file_format == 'parquet':
+        if os.path.isdir(file_path):
+            part_paths = [os.path.join(file_path, name) for name in sorted(os.listdir(file_path)) if name.endswith('.parquet')]
+        else:
+            part_paths = [file_path]
+        for part_path in part_paths:
+            part_max = _parquet_last_created_at(part_path)
+            if part_max is not None and (last_exported_at is None or part_max > last_exported_at):
+                last_exported_at = part_max
+    else:
+        with gzip.open(file_path, 'rt', encoding='utf-8', newline='') as text_file:
+            for row in csv.DictReader(text_file):
+                if not row.get('created_at'):
+                    continue
+                ts = int(datetime.strptime(row['created_at'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp())
+                if last_exported_at is None or ts > last_exported_at:
+                    last_exported_at = ts
+    return last_exported_at
+
+def export_usage_logs(
+    records: Iterable[Dict[str, Any]],
+    destination: Union[str, BinaryIO],
+    file_format: str = 'parquet',
+    chunk_size: int = 50000,
+    since: Optional[int] = None
+) -> int:
+    """
+    Streams usage log records to a Parquet or gzip CSV file in fixed-size chunks.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): The log records, e.g. the 'data' list returned by `retrieve_key_usage_details`.
+            Any iterable is accepted so that callers can pass a generator and keep memory bounded.
+        destination (Union[str, BinaryIO]): The output file path, a Parquet dataset directory, or a writable binary file object.
+            When an existing directory is given for Parquet, the export is written to a `part-<since>.parquet` file inside it.
+        file_format (str, optional): Either 'parquet' or 'csv' (gzip compressed). Defaults to 'parquet'.
+        chunk_size (int, optional): The number of records held in memory per write. Defaults to 50000.
+        since (Optional[int], optional): Only records with `created_at` at or after this unix timestamp are exported.
+            Timestamps have second resolution, so records sharing the second of the resume point are exported again
+            rather than lost, and consumers must drop duplicate rows when combining exports.
+            When set with the CSV format, rows are appended to an existing export instead of overwriting it.
+            Parquet files cannot be appended to, so resumed Parquet exports must target a dataset directory.
+
+    Returns:
+        int: The number of records exported.
+
+    Raises:
+        FileExistsError: If a resumed Parquet export targets an existing file, which would be overwritten.
+
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}', expected one of {EXPORT_FORMATS}.")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    if file_format == 'parquet' and isinstance(destination, str):
+        if os.path.isdir(destination):
+            # Re-running an export with the same resume point replaces its part file with a superset
+            destination = os.path.join(destination, f'part-{since or 0}.parquet')
+        elif since is not None and os.path.exists(destination):
+            raise FileExistsError(
+                f"Resuming a Parquet export would overwrite {destination}, export into a dataset directory instead."
+            )
+
+    logger.debug(f"Exporting usage logs as {file_format}...")
+    if since is not None:
+        records = (r for r in records if (r.get('created_at') or 0) >= since)
+    chunks = _iter_chunks(records, chunk_size)
+
+    try:
+        if file_format == 'parquet':
+            written = _write_parquet(chunks, destination)
+        else:
+            written = _write_csv(chunks, destination, append=since is not None)
+    except (OSError, pa.ArrowException) as e:
+        logger.error(f"Error exporting usage logs: {e}")
+        raise
+
+    logger.info(f"{written} usage log records exported successfully!")
+    return written
+
+
+# Example Usage
+if __name__ == "__main__":
+    from .usage import retrieve_key_usage_details
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path='./config/.env')
+    openai_api_key = os.getenv('AIGC_API_KEY')
+
+    _, _, usage_logs = retrieve_key_usage_details(api_key=openai_api_key)
+
+    export_path = './exports/usage_logs.csv.gz'
+    last_exported_at = read_last_exported_at(export_path, file_format='csv')
+    exported = export_usage_logs(usage_logs.get('data'), export_path, file_format='csv', since=last_exported_at)
+    print(f"Exported Records\t: {exported}")
@@ -1,8 +1,7 @@
 import os, requests
-import streamlit as st
 from typing import Optional, Dict, Any
 from requests import RequestException
-from utils import Logger, JSONHandler
+from utils import Logger, JSONHandler, shared_cache
 
 
 # Initialize logging
@@ -10,10 +9,14 @@ module_name = os.path.basename(__file__).split('.')[0]
 log = Logger(logger_name=module_name, log_level='info')
 logger = log.get_logger()
 
-# API Endpoint
-AIGC_PRICING_ENDPOINT = 'https://aigc.x-see.cn/api/pricing'
+# API Endpoint, the base URL can be overridden e.g. to target a local API stub
+AIGC_BASE_URL = os.getenv('AIGC_BASE_URL', 'https://aigc.x-see.cn')
+AIGC_PRICING_ENDPOINT = f'{AIGC_BASE_URL}/api/pricing'
 
-@st.cache_resource
+# Seconds before the pricing catalog is fetched again
+MODEL_INFO_TTL = 3600
+
+@shared_cache.cached(namespace='model_info', ttl=MODEL_INFO_TTL, memory=True)
 def retrieve_model_info(base_url: str = AIGC_PRICING_ENDPOINT) -> Optional[Dict[str, Any]]:
     """
     Retrieves model information from the given API endpoint.
@@ -0,0 +1,291 @@
+import os, json, time
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List
+from utils import Logger, JSONHandler
+from .model_info import retrieve_model_info, calculate_model_pricing
+from .usage import retrieve_key_usage_details
+from .statistics import UsageStatistics
+from .export import QUOTA_TO_USD
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+REPORT_FORMATS = ('json', 'parquet')
+DEFAULT_START_DATE = '2024-6-6'
+
+
+def _mask_api_key(api_key: str) -> str:
+    """
+    Masks an API key so that it can be written to reports and logs.
+
+    Args:
+        api_key (str): The API key to mask.
+
+    Returns:
+        str: The key prefix and its last four characters.
+
+    """
+    return f'{api_key[:3]}...{api_key[-4:]}' if len(api_key) > 8 else '***'
+
+def _parse_report_date(value: str) -> datetime:
+    """
+    Parses a report date as the start of that day in UTC, the timezone of the usage exports.
+
+    Args:
+        value (str): The date in YYYY-MM-DD format.
+
+    Returns:
+        datetime: Midnight UTC of the date.
+
+    Raises:
+        ValueError: If the date is not in YYYY-MM-DD format.
+
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a date string, got {type(value).__name__}.")
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+def _utc_today() -> str:
+    """
+    Returns:
+        str: Today's date in UTC, in YYYY-MM-DD format.
+
+    """
+    return datetime.now(timezone.utc).date().isoformat()
+
+def read_report_jobs(file_path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the keys and date ranges to report on from a JSON file.
+
+    The file holds a list of objects with either an `api_key` or an `api_key_env` naming the environment
+    variable that contains the key, and optional `start_date` and `end_date` in YYYY-MM-DD format, as UTC days.
+
+    Args:
+        file_path (str): The path to the JSON file.
+
+    Returns:
+        List[Dict[str, Any]]: The report jobs with the API key resolved and default dates filled in.
+
+    Raises:
+        ValueError: If the file cannot be read, or a job is malformed, has no API key or has an invalid date range.
+
+    """
+    entries = JSONHandler.read_json_file(os.path.abspath(file_path))
+    if not isinstance(entries, list):
+        raise ValueError(f"Expected a list of report jobs in {file_path}.")
+
+    jobs = []
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Report job {position} in {file_path} must be an object, got {type(entry).__name__}.")
+        api_key = entry.get('api_key') or os.getenv(entry.get('api_key_env', ''))
+        if not api_key:
+            raise ValueError(f"Report job {position} in {file_path} has no API key.")
+
+        start_date = entry.get('start_date') or DEFAULT_START_DATE
+        end_date = entry.get('end_date') or _utc_today()
+        try:
+            if _parse_report_date(start_date) > _parse_report_date(end_date):
+                raise ValueError(f"{start_date} is after {end_date}.")
+        except ValueError as e:
+            raise ValueError(f"Report job {position} in {file_path} has an invalid date range: {e}") from e
+        jobs.append({'api_key': api_key, 'start_date': start_date, 'end_date': end_date})
+    return jobs
+
+def summarize_key_usage(
+    api_key: str,
+    start_date: str = DEFAULT_START_DATE,
+    end_date: Optional[str] = None,
+    model_infos: Optional[Dict[str, Any]] = None,
+    category_rate: float = 0.49
+) -> Dict[str, Any]:
+    """
+    Fetches the usage of one API key and summarizes it per model over the date range.
+
+    Costs are computed once per model on the summed token counts, which is exact since
+    token based pricing is linear in the number of tokens.
+
+    Args:
+        api_key (str): The API key for authentication.
+        start_date (str, optional): The first UTC day of the report. Defaults to '2024-6-6'.
+        end_date (Optional[str], optional): The last UTC day of the report, inclusive. Defaults to today in UTC.
+        model_infos (Optional[Dict[str, Any]], optional): The pricing catalog passed to the pricing engine.
+        category_rate (float, optional): The category rate passed to the pricing engine. Defaults to 0.49.
+
+    Returns:
+        Dict[str, Any]: The key summary, including totals, a per-model breakdown and the elapsed time.
+
+    """
+    started = time.perf_counter()
+    end_date = end_date or _utc_today()
+    subscription, key_usage, usage_logs = retrieve_key_usage_details(api_key, start_date, end_date)
+    fetched = time.perf_counter()
+
+    range_start = _parse_report_date(start_date).timestamp()
+    range_end = (_parse_report_date(end_date) + timedelta(days=1)).timestamp()
+    records = sorted(
+        (r for r in (usage_logs or {}).get('data') or [] if range_start <= (r.get('created_at') or 0) < range_end),
+        key=lambda r: r['created_at']
+    )
+
+    usage_statistics = UsageStatistics()
+    usage_statistics.ingest(records)
+
+    models: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        model = models.setdefault(record.get('model_name') or 'unknown', {
+            'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'billed_cost': 0.0
+        })
+        model['requests'] += 1
+        model['prompt_tokens'] += record.get('prompt_tokens') or 0
+        model['completion_tokens'] += record.get('completion_tokens') or 0
+        model['billed_cost'] += (record.get('quota') or 0) * QUOTA_TO_USD
+
+    latency = {s['model_name']: s for s in usage_statistics.model_summaries()}
+    for model_name, model in models.items():
+        model['estimated_cost'] = calculate_model_pricing(
+            model_name, model['prompt_tokens'], model['completion_tokens'],
+            category_rate=category_rate, model_infos=model_infos
+        )
+        model['p50_response_time'] = latency.get(model_name, {}).get('p50')
+        model['p95_response_time'] = latency.get(model_name, {}).get('p95')
+
+    elapsed = time.perf_counter() - started
+    return {
+        'api_key': _mask_api_key(api_key),
+        'token_names': sorted({r.get('token_name') for r in records if r.get('token_name')}),
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_limit': (subscription or {}).get('soft_limit_usd'),
+        'total_usage': ((key_usage or {}).get('total_usage') or 0) / 100,
+        'requests': len(records),
+        'prompt_tokens': sum(m['prompt_tokens'] for m in models.values()),
+        'completion_tokens': sum(m['completion_tokens'] for m in models.values()),
+        'billed_cost': sum(m['billed_cost'] for m in models.values()),
+        'estimated_cost': sum(m['estimated_cost'] for m in models.values()),
+        'models': models,
+        'fetch_seconds': round(fetched - started, 3),
+        'elapsed_seconds': round(elapsed, 3)
+    }
+
+def _write_json_report(file_path: str, summaries: List[Dict[str, Any]]) -> None:
+    """
+    Writes the key summaries to a JSON file. Unlike JSONHandler.save_to_json, write errors are raised
+    so that scheduled jobs can detect a missing report.
+
+    Args:
+        file_path (str): The path to the JSON file.
+        summaries (List[Dict[str, Any]]): The key summaries returned by summarize_key_usage.
+
+    """
+    with open(file_path, 'w') as json_file:
+        json.dump(summaries, json_file, indent=4)
+
+def _write_parquet_report(file_path: str, summaries: List[Dict[str, Any]]) -> None:
+    """
+    Writes the key summaries to Parquet, flattened to one row per key and model. Keys that failed
+    or have no usage in the date range are written as a single row with empty model columns,
+    so that the report lists the same keys as the JSON report.
+
+    Args:
+        file_path (str): The path to the Parquet file.
+        summaries (List[Dict[str, Any]]): The key summaries returned by summarize_key_usage.
+
+    """
+    rows = [
+        {
+            'api_key': summary['api_key'],
+            'start_date': summary.get('start_date'),
+            'end_date': summary.get('end_date'),
+            'total_limit': summary.get('total_limit'),
+            'total_usage': summary.get('total_usage'),
+            'model_name': model_name,
+            **model,
+            'error': summary.get('error')
+        }
+        for summary in summaries
+        for model_name, model in (summary.get('models') or {None: {}}).items()
+    ]
+    schema = pa.schema([
+        ('api_key', pa.string()),
+        ('start_date', pa.string()),
+        ('end_date', pa.string()),
+        ('total_limit', pa.float64()),
+        ('total_usage', pa.float64()),
+        ('model_name', pa.string()),
+        ('requests', pa.int64()),
+        ('prompt_tokens', pa.int64()),
+        ('completion_tokens', pa.int64()),
+        ('billed_cost', pa.float64()),
+        ('estimated_cost', pa.float64()),
+        ('p50_response_time', pa.float64()),
+        ('p95_response_time', pa.float64()),
+        ('error', pa.string())
+    ])
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), file_path)
+
+def generate_usage_report(
+    jobs: List[Dict[str, Any]],
+    output_path: str,
+    report_format: str = 'json',
+    max_workers: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Summarizes the usage of many API keys concurrently and writes the summaries to a report file.
+    Keys that fail to fetch are reported with an error instead of aborting the whole report.
+
+    Args:
+        jobs (List[Dict[str, Any]]): The report jobs, see read_report_jobs.
+        output_path (str): The path to the report file.
+        report_format (str, optional): Either 'json' or 'parquet'. Defaults to 'json'.
+        max_workers (int, optional): The number of keys fetched concurrently. Defaults to 8.
+
+    Returns:
+        List[Dict[str, Any]]: The key summaries, in the order of the jobs.
+
+    Raises:
+        OSError: If the report file cannot be written.
+        pa.ArrowException: If the Parquet report cannot be written.
+
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format '{report_format}', expected one of {REPORT_FORMATS}.")
+
+    started = time.perf_counter()
+    model_infos = retrieve_model_info()
+    summaries: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(summarize_key_usage, model_infos=model_infos, **job): position
+            for position, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            position = futures[future]
+            masked_key = _mask_api_key(jobs[position]['api_key'])
+            try:
+                summaries[position] = future.result()
+                logger.info(f"Key {masked_key} summarized in {summaries[position]['elapsed_seconds']:.3f}s.")
+            except Exception as e:
+                logger.error(f"Unable to summarize key {masked_key}: {e}")
+                summaries[position] = {
+                    'api_key': masked_key,
+                    'start_date': jobs[position].get('start_date'),
+                    'end_date': jobs[position].get('end_date'),
+                    'error': str(e)
+                }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    if report_format == 'json':
+        _write_json_report(output_path, summaries)
+    else:
+        _write_parquet_report(output_path, summaries)
+
+    logger.info(f"Usage report of {len(jobs)} keys written to {output_path} in {time.perf_counter() - started:.3f}s.")
+    return summaries
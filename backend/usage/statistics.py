@@ -0,0 +1,359 @@
+import os, math
+from typing import Optional, Dict, Any, Iterable, List
+from utils import Logger
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch style).
+
+    Values are counted in logarithmically sized buckets, so memory depends on the range of values
+    and never on the number of values added. When the number of buckets exceeds max_buckets,
+    the lowest buckets are collapsed together, which only affects the accuracy of the lowest quantiles.
+
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Initializes an empty sketch.
+
+        Args:
+            relative_accuracy (float): The maximum relative error of the returned quantiles. Defaults to 0.01.
+            max_buckets (int): The maximum number of buckets kept in memory. Defaults to 2048.
+
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """
+        Adds a non-negative value to the sketch. Negative values are clamped to zero.
+
+        Args:
+            value (float): The value to add.
+
+        """
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Merges another sketch into this one. Both sketches must share the same relative accuracy.
+
+        Args:
+            other (QuantileSketch): The sketch to merge.
+
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates the value at the given quantile.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The estimated value, or None if the sketch is empty.
+
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def _collapse(self) -> None:
+        """
+        Folds the lowest buckets into one so that at most max_buckets remain.
+
+        """
+        indices = sorted(self.buckets)
+        excess = len(indices) - self.max_buckets
+        target = indices[excess]
+        for index in indices[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+
+class RunningStats:
+    """
+    Running count, mean and variance using Welford's algorithm.
+
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Adds a value to the running statistics.
+
+        Args:
+            value (float): The value to add.
+
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """
+        Merges another set of running statistics into this one.
+
+        Args:
+            other (RunningStats): The statistics to merge.
+
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class LatencyStats:
+    """
+    Response time and token throughput statistics for a single model or API key.
+
+    Besides the full history sketch used for the quantiles, an exponentially weighted moving average
+    tracks recent latency so that drift can be detected without keeping a window of raw values.
+    The moving average estimates the recent mean, so it is compared against the mean of the full history:
+    response times are right-skewed, and comparing it against the median would flag unchanged latency.
+
+    """
+    def __init__(self, recent_weight: float = 0.05, relative_accuracy: float = 0.01):
+        """
+        Initializes empty statistics.
+
+        Args:
+            recent_weight (float): The smoothing factor of the recent latency average. Defaults to 0.05,
+                which roughly weighs the last 20 requests.
+            relative_accuracy (float): The relative accuracy of the latency sketch. Defaults to 0.01.
+
+        """
+        self.recent_weight = recent_weight
+        self.latency = QuantileSketch(relative_accuracy=relative_accuracy)
+        self.latency_mean = RunningStats()
+        self.throughput = RunningStats()
+        self.total_tokens = 0
+        self.recent_latency: Optional[float] = None
+
+    def add(self, use_time: float, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """
+        Adds a single request to the statistics.
+
+        Args:
+            use_time (float): The response time of the request in seconds.
+            prompt_tokens (int): The number of input tokens. Defaults to 0.
+            completion_tokens (int): The number of output tokens. Defaults to 0.
+
+        """
+        self.latency.add(use_time)
+        self.latency_mean.add(use_time)
+        self.total_tokens += prompt_tokens + completion_tokens
+        if use_time > 0:
+            self.throughput.add(completion_tokens / use_time)
+
+        if self.recent_latency is None:
+            self.recent_latency = float(use_time)
+        else:
+            self.recent_latency += self.recent_weight * (use_time - self.recent_latency)
+
+    def merge(self, other: 'LatencyStats') -> None:
+        """
+        Merges statistics collected elsewhere, e.g. for another API key, into this one.
+        The recent latency of the merged statistics is the request weighted average of both.
+
+        Args:
+            other (LatencyStats): The statistics to merge.
+
+        """
+        if other.recent_latency is not None:
+            if self.recent_latency is None:
+                self.recent_latency = other.recent_latency
+            else:
+                total = self.latency.count + other.latency.count
+                self.recent_latency = (
+                    self.recent_latency * self.latency.count + other.recent_latency * other.latency.count
+                ) / total
+        self.latency.merge(other.latency)
+        self.latency_mean.merge(other.latency_mean)
+        self.throughput.merge(other.throughput)
+        self.total_tokens += other.total_tokens
+
+    def is_drifting(self, threshold: float = 1.5, min_requests: int = 30, min_baseline: float = 0.0) -> bool:
+        """
+        Checks whether the recent latency has drifted above the baseline mean.
+
+        Args:
+            threshold (float): The ratio of recent latency to baseline considered as drift. Defaults to 1.5.
+            min_requests (int): The minimum number of requests before drift is reported. Defaults to 30.
+            min_baseline (float): The lowest baseline in seconds that drift is measured against, e.g. to ignore
+                sub-second jitter when response times are reported in whole seconds. Defaults to 0.0.
+
+        Returns:
+            bool: True if the recent latency exceeds max(baseline mean, min_baseline) by the threshold ratio.
+
+        """
+        if self.latency.count < min_requests or self.recent_latency is None:
+            return False
+        baseline = max(self.latency_mean.mean, min_baseline)
+        return self.recent_latency > baseline * threshold
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarizes the statistics into a flat dictionary.
+
+        Returns:
+            Dict[str, Any]: Request count, latency quantiles, throughput and drift flag.
+
+        """
+        return {
+            'requests': self.latency.count,
+            'p50': self.latency.quantile(0.5),
+            'p95': self.latency.quantile(0.95),
+            'p99': self.latency.quantile(0.99),
+            'recent_latency': self.recent_latency,
+            'mean_throughput': self.throughput.mean,
+            'stddev_throughput': self.throughput.stddev,
+            'total_tokens': self.total_tokens,
+            'drifting': self.is_drifting()
+        }
+
+
+class UsageStatistics:
+    """
+    Streaming response time statistics grouped per model and per API key.
+
+    """
+    def __init__(self):
+        self.per_model: Dict[str, LatencyStats] = {}
+        self.per_key: Dict[str, LatencyStats] = {}
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ingests request log records. Records should be ingested in chronological order
+        so that the recent latency reflects the latest requests.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): The log records returned by the request log endpoint.
+
+        Returns:
+            int: The number of records ingested.
+
+        """
+        ingested = 0
+        for record in records:
+            use_time = record.get('use_time')
+            if use_time is None:
+                continue
+            prompt_tokens = record.get('prompt_tokens') or 0
+            completion_tokens = record.get('completion_tokens') or 0
+
+            for groups, name in (
+                (self.per_model, record.get('model_name') or 'unknown'),
+                (self.per_key, record.get('token_name') or 'unknown')
+            ):
+                if name not in groups:
+                    groups[name] = LatencyStats()
+                groups[name].add(use_time, prompt_tokens, completion_tokens)
+            ingested += 1
+
+        logger.debug(f"{ingested} request log records ingested.")
+        return ingested
+
+    def merge(self, other: 'UsageStatistics') -> None:
+        """
+        Merges statistics collected from another set of logs into this one.
+
+        Args:
+            other (UsageStatistics): The statistics to merge.
+
+        """
+        for groups, other_groups in ((self.per_model, other.per_model), (self.per_key, other.per_key)):
+            for name, stats in other_groups.items():
+                if name not in groups:
+                    groups[name] = LatencyStats()
+                groups[name].merge(stats)
+
+    def model_summaries(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: One summary per model, see LatencyStats.summary.
+
+        """
+        return [{'model_name': name, **stats.summary()} for name, stats in sorted(self.per_model.items())]
+
+    def key_summaries(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: One summary per API key, see LatencyStats.summary.
+
+        """
+        return [{'token_name': name, **stats.summary()} for name, stats in sorted(self.per_key.items())]
+
+    def drifting_models(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The models whose recent latency drifted from their baseline.
+
+        """
+        return [name for name, stats in sorted(self.per_model.items()) if stats.is_drifting()]
+
+
+# Example Usage
+if __name__ == "__main__":
+    from .usage import retrieve_key_usage_details
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path='./config/.env')
+    openai_api_key = os.getenv('AIGC_API_KEY')
+
+    _, _, usage_logs = retrieve_key_usage_details(api_key=openai_api_key)
+
+    usage_statistics = UsageStatistics()
+    usage_statistics.ingest(sorted(usage_logs.get('data'), key=lambda log: log['created_at']))
+    for model_summary in usage_statistics.model_summaries():
+        print(model_summary)
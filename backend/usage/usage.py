@@ -1,8 +1,8 @@
 import os, requests
 from datetime import date
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, List, Any
 from requests import RequestException
-from utils import Logger
+from utils import Logger, shared_cache
 
 
 # Initialize logging
@@ -10,6 +10,15 @@ module_name = os.path.basename(__file__).split('.')[0]
 log = Logger(logger_name=module_name, log_level='info')
 logger = log.get_logger()
 
+# API Endpoint, the base URL can be overridden e.g. to target a local API stub
+AIGC_BASE_URL = os.getenv('AIGC_BASE_URL', 'https://aigc.x-see.cn')
+
+# Seconds before the usage of a key is fetched again
+KEY_USAGE_TTL = 60
+
+# Seconds other server processes wait for an in-flight fetch of the same key, the request log of large keys can take minutes
+KEY_USAGE_LEASE_TIMEOUT = 180
+
 
 def _key_subscription(api_key: str) -> Optional[Dict[str, Any]]:
     """
@@ -23,7 +32,7 @@ def _key_subscription(api_key: str) -> Optional[Dict[str, Any]]:
     
     """
     logger.debug("Fetching API key subscription status...")
-    base_url = 'https://aigc.x-see.cn/v1/dashboard/billing/subscription'
+    base_url = f'{AIGC_BASE_URL}/v1/dashboard/billing/subscription'
     payload = {}
     headers = {
         'Content-Type': 'application/json',
@@ -38,21 +47,22 @@ def _key_subscription(api_key: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Request error occurred: {e}")
         raise
 
-def _key_usage(api_key: str, start_date: str='2024-6-6', end_date: str=date.today()) -> Optional[Dict[str, Any]]:
+def _key_usage(api_key: str, start_date: str='2024-6-6', end_date: Optional[str]=None) -> Optional[Dict[str, Any]]:
     """
     Fetches the usage details for the provided API key within a specified date range.
 
     Args:
         api_key (str): The API key for authentication.
         start_date (str, optional): The start date for fetching usage data. Defaults to '2024-6-6'.
-        end_date (str, optional): The end date for fetching usage data. Defaults to date.today().
+        end_date (str, optional): The end date for fetching usage data. Defaults to today.
 
     Returns:
         Optional[Dict[str, Any]]: Usage details if successful, None if there is an error.
     
     """
     logger.debug("Fetching API key usage...")
-    base_url = f'https://aigc.x-see.cn/v1/dashboard/billing/usage?start_date={start_date}&end_date={end_date}'
+    end_date = end_date or date.today()
+    base_url = f'{AIGC_BASE_URL}/v1/dashboard/billing/usage?start_date={start_date}&end_date={end_date}'
     payload = {}
     headers = {
         'Content-Type': 'application/json',
@@ -79,7 +89,7 @@ def _key_request_log(api_key: str) -> Optional[Dict[str, Any]]:
     
     """
     logger.debug("Fetching API key request logs...")
-    base_url = f'https://aigc.x-see.cn/api/log/token?key={api_key}'
+    base_url = f'{AIGC_BASE_URL}/api/log/token?key={api_key}'
     payload = {}
     headers = {'Content-Type': 'application/json'}
     
@@ -92,12 +102,35 @@ def _key_request_log(api_key: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Request error occurred: {e}")
         raise
 
-def retrieve_key_usage_details(api_key: str) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
+@shared_cache.cached(namespace='key_usage_details', ttl=KEY_USAGE_TTL, hash_args=True, lease_timeout=KEY_USAGE_LEASE_TIMEOUT)
+def _cached_key_usage_details(api_key: str, start_date: str, end_date: Optional[str]) -> List[Optional[Dict]]:
+    """
+    Fetches the subscription details, usage data, and request logs through the shared cache.
+    The API key is hashed before being used as a cache key.
+
+    Args:
+        api_key (str): The API key for authentication.
+        start_date (str): The start date for fetching usage data.
+        end_date (Optional[str]): The end date for fetching usage data.
+
+    Returns:
+        List[Optional[Dict]]: The subscription details, usage data and request logs.
+    
+    """
+    return [_key_subscription(api_key), _key_usage(api_key, start_date, end_date), _key_request_log(api_key)]
+
+def retrieve_key_usage_details(
+    api_key: str,
+    start_date: str = '2024-6-6',
+    end_date: Optional[str] = None
+) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
     """
     Retrieves subscription details, usage data, and request logs for the provided API key.
 
     Args:
         api_key (str): The API key for authentication.
+        start_date (str, optional): The start date for fetching usage data. Defaults to '2024-6-6'.
+        end_date (str, optional): The end date for fetching usage data. Defaults to today.
 
     Returns:
         Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]: 
@@ -109,7 +142,8 @@ def retrieve_key_usage_details(api_key: str) -> Tuple[Optional[Dict], Optional[D
     """
     logger.info('Fetching API key details...')
     try:
-        return _key_subscription(api_key), _key_usage(api_key), _key_request_log(api_key)
+        subscription, key_usage, request_logs = _cached_key_usage_details(api_key, start_date, end_date)
+        return subscription, key_usage, request_logs
     except Exception as e:
         logger.error(f'An unexpected error has occured: {e}')
         raise
@@ -0,0 +1,22 @@
+import os
+from .api_stub import APIStub
+from .server import StreamlitServer
+from .session import StreamlitSession, simulate_session
+from utils.logger import Logger
+
+
+__all__ = [
+    'APIStub',
+    'StreamlitServer',
+    'StreamlitSession',
+    'simulate_session'
+]
+
+# Get the package name based on the directory name
+package_name = os.path.basename(os.path.dirname(__file__))
+
+# Initialize the logger instance
+log = Logger(logger_name=package_name, log_level='info')
+logger = log.get_logger()
+
+logger.info('Module initialization complete.')
\ No newline at end of file
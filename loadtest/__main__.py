@@ -0,0 +1,139 @@
+import os, sys, time, asyncio, argparse
+from typing import Dict, Any, List
+from utils import Logger, JSONHandler
+from .api_stub import APIStub
+from .server import StreamlitServer
+from .session import StreamlitSession, simulate_session
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """
+    Computes a percentile with the nearest-rank method.
+
+    Args:
+        values (List[float]): The values, in any order.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The value at the percentile, or 0.0 if there are no values.
+
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))]
+
+async def run_load_test(server: StreamlitServer, sessions: int, iterations: int, timeout: float) -> Dict[str, Any]:
+    """
+    Drives concurrent sessions against one Streamlit server process over its websocket, and measures
+    the script run times and the memory the server holds per connected session.
+
+    Args:
+        server (StreamlitServer): The running server.
+        sessions (int): The number of concurrent sessions.
+        iterations (int): The number of pricing and tracker round trips per session.
+        timeout (float): Seconds allowed per script run.
+
+    Returns:
+        Dict[str, Any]: Throughput, script run time percentiles, errors and memory per session.
+
+    Raises:
+        RuntimeError: If the warm-up session fails, e.g. because the page no longer renders the expected widgets.
+
+    """
+    # Warm up imports and process-wide caches so that they are not attributed to the measured sessions
+    warmup = StreamlitSession(server.ws_url, timeout=timeout)
+    warmup_result = await simulate_session(warmup, 'sk-load-test-warmup', iterations=1)
+    warmup.close()
+    if warmup_result['failed']:
+        raise RuntimeError("Warm-up session failed, see the session log for details.")
+
+    memory_before = server.memory_bytes()
+    clients = [StreamlitSession(server.ws_url, timeout=timeout) for _ in range(sessions)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        simulate_session(client, f'sk-load-test-{i:04d}', iterations) for i, client in enumerate(clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    # Every session is still connected, so its state is still held by the server
+    memory_after = server.memory_bytes()
+    for client in clients:
+        client.close()
+
+    run_times = [t for result in results for t in result['run_times']]
+    return {
+        'sessions': sessions,
+        'iterations': iterations,
+        'failed_sessions': sum(result['failed'] for result in results),
+        'script_runs': len(run_times),
+        'errors': sum(result['errors'] for result in results),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_runs_per_second': round(len(run_times) / elapsed, 3),
+        'p50_run_seconds': round(_percentile(run_times, 50), 4),
+        'p95_run_seconds': round(_percentile(run_times, 95), 4),
+        'max_run_seconds': round(max(run_times, default=0.0), 4),
+        'server_rss_mb': round(memory_after / 2**20, 3),
+        'memory_per_session_mb': round((memory_after - memory_before) / sessions / 2**20, 3)
+    }
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+
+    """
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description="Load test the API Usage page of one Streamlit server process against a local API stub.")
+    parser.add_argument('-n', '--sessions', type=int, default=10, help="Number of concurrent sessions. Defaults to 10.")
+    parser.add_argument('-i', '--iterations', type=int, default=5, help="Pricing and tracker round trips per session. Defaults to 5.")
+    parser.add_argument('--log-count', type=int, default=200, help="Request log records returned per key by the stub. Defaults to 200.")
+    parser.add_argument('--api-latency', type=float, default=0.0, help="Seconds of delay added to every stub response. Defaults to 0.")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds allowed per script run. Defaults to 30.")
+    parser.add_argument('-o', '--output', help="Optional JSON file to write the results to.")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """
+    Starts the API stub and one Streamlit server pointed at it, and runs the load test.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        int: The process exit code, 1 if any session failed or any script run showed an error,
+            and 2 if the server or the warm-up session could not be started.
+
+    """
+    args = _parse_args(argv)
+    stub = APIStub(log_count=args.log_count, latency=args.api_latency).start()
+    server = StreamlitServer(env={'AIGC_BASE_URL': stub.base_url})
+
+    try:
+        server.start()
+        results = asyncio.run(run_load_test(server, args.sessions, args.iterations, args.timeout))
+    except RuntimeError as e:
+        logger.error(e)
+        return 2
+    finally:
+        server.stop()
+        stub.stop()
+
+    for name, value in results.items():
+        print(f"{name:<28}: {value}")
+    if args.output:
+        JSONHandler.save_to_json(os.path.abspath(args.output), results)
+    return 1 if results['errors'] or results['failed_sessions'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
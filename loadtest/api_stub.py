@@ -0,0 +1,137 @@
+import os, json, time, random, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+from typing import Optional, Dict, Any
+from utils import Logger, JSONHandler
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+
+class APIStub:
+    """
+    Local stand-in for the AIGC API, serving the pricing catalog from the backup file
+    and synthetic subscription, usage and request log data for any API key.
+
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, log_count: int = 200, latency: float = 0.0):
+        """
+        Initializes the stub server without starting it.
+
+        Args:
+            host (str): The host to bind to. Defaults to '127.0.0.1'.
+            port (int): The port to bind to, 0 picks a free port. Defaults to 0.
+            log_count (int): The number of request log records returned per key. Defaults to 200.
+            latency (float): Seconds of artificial delay added to every response. Defaults to 0.0.
+
+        """
+        self.latency = latency
+        self.model_infos = JSONHandler.read_json_file('../backup/model_info.json')
+        self.request_logs = self._generate_request_logs(log_count)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _generate_request_logs(self, log_count: int) -> Dict[str, Any]:
+        """
+        Generates request log records using the available token based models.
+
+        Args:
+            log_count (int): The number of records to generate.
+
+        Returns:
+            Dict[str, Any]: The request log response body.
+
+        """
+        models = [m['model_name'] for m in self.model_infos['data'] if m['available'] and m['quota_type'] == 0]
+        rng = random.Random(0)
+        now = int(time.time())
+        return {
+            'success': True,
+            'data': [
+                {
+                    'created_at': now - i * 60,
+                    'token_name': 'load-test',
+                    'model_name': rng.choice(models),
+                    'use_time': rng.randint(1, 10),
+                    'prompt_tokens': rng.randint(10, 2000),
+                    'completion_tokens': rng.randint(10, 1000),
+                    'quota': rng.randint(100, 50000)
+                }
+                for i in range(log_count)
+            ]
+        }
+
+    def _handler(self):
+        """
+        Builds the request handler class bound to this stub.
+
+        Returns:
+            type: The BaseHTTPRequestHandler subclass serving the stubbed routes.
+
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            routes = {
+                '/api/pricing': lambda: stub.model_infos,
+                '/v1/dashboard/billing/subscription': lambda: {'object': 'billing_subscription', 'soft_limit_usd': 100.0},
+                '/v1/dashboard/billing/usage': lambda: {'object': 'list', 'total_usage': 1234.5},
+                '/api/log/token': lambda: stub.request_logs
+            }
+
+            def do_GET(self):
+                route = self.routes.get(urlparse(self.path).path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps(route() if route else {'success': False, 'message': 'Not found'}).encode('utf-8')
+                self.send_response(200 if route else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'APIStub':
+        """
+        Serves requests from a background thread.
+
+        Returns:
+            APIStub: The running stub.
+
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"API stub serving at {self.base_url}.")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving requests and releases the port.
+
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        logger.info("API stub stopped.")
+
+
+# Example Usage
+if __name__ == "__main__":
+    stub = APIStub(port=8765).start()
+    try:
+        print(f"Serving at {stub.base_url}, export AIGC_BASE_URL={stub.base_url} to use it. Press Ctrl+C to stop.")
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,137 @@
+import os, sys, time, socket, tempfile, subprocess
+import psutil
+import requests
+from typing import Optional, Dict
+from requests import RequestException
+from utils import Logger
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StreamlitServer:
+    """
+    A single `streamlit run streamlit_app.py` server process, started headless on a local port,
+    so that load tests measure the capacity of one real server process.
+
+    """
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        env: Optional[Dict[str, str]] = None,
+        startup_timeout: float = 60.0
+    ):
+        """
+        Initializes the server without starting it.
+
+        Args:
+            host (str): The host to bind to. Defaults to '127.0.0.1'.
+            port (int): The port to bind to, 0 picks a free port. Defaults to 0.
+            env (Optional[Dict[str, str]]): Environment variables added to those of the current process,
+                e.g. AIGC_BASE_URL to target the API stub. Defaults to None.
+            startup_timeout (float): Seconds to wait for the server to report healthy. Defaults to 60.0.
+
+        """
+        self.host = host
+        self.port = port or self._free_port(host)
+        self.env = {**os.environ, **(env or {})}
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._output = None
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        with socket.socket() as probe:
+            probe.bind((host, 0))
+            return probe.getsockname()[1]
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def ws_url(self) -> str:
+        return f'ws://{self.host}:{self.port}/_stcore/stream'
+
+    def _read_output(self) -> str:
+        """
+        Returns:
+            str: The last lines written by the server process, to explain startup failures.
+
+        """
+        self._output.seek(0)
+        return '\n'.join(self._output.read().decode('utf-8', errors='replace').splitlines()[-20:])
+
+    def start(self) -> 'StreamlitServer':
+        """
+        Starts the server process and waits until its health endpoint responds.
+
+        Returns:
+            StreamlitServer: The running server.
+
+        Raises:
+            RuntimeError: If the server exits or does not become healthy within the startup timeout.
+
+        """
+        self._output = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'streamlit', 'run', 'streamlit_app.py',
+                '--server.headless', 'true',
+                '--server.address', self.host,
+                '--server.port', str(self.port),
+                '--server.fileWatcherType', 'none',
+                '--browser.gatherUsageStats', 'false'
+            ],
+            cwd=REPO_ROOT,
+            env=self.env,
+            stdout=self._output,
+            stderr=subprocess.STDOUT
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Streamlit server exited with code {self._process.returncode}:\n{self._read_output()}")
+            try:
+                if requests.get(f'{self.base_url}/_stcore/health', timeout=1).ok:
+                    logger.info(f"Streamlit server (pid {self._process.pid}) serving at {self.base_url}.")
+                    return self
+            except RequestException:
+                pass
+            time.sleep(0.2)
+
+        output = self._read_output()
+        self.stop()
+        raise RuntimeError(f"Streamlit server did not become healthy within {self.startup_timeout}s:\n{output}")
+
+    def memory_bytes(self) -> int:
+        """
+        Returns:
+            int: The resident set size of the server process.
+
+        """
+        return psutil.Process(self._process.pid).memory_info().rss
+
+    def stop(self) -> None:
+        """
+        Terminates the server process.
+
+        """
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        if self._output:
+            self._output.close()
+            self._output = None
+        logger.info("Streamlit server stopped.")
@@ -0,0 +1,204 @@
+import os, time, asyncio
+from typing import Optional, Dict, Any, List
+from tornado.websocket import websocket_connect, WebSocketClientConnection
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from utils import Logger
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+# Matches the server's default server.maxMessageSize
+MAX_MESSAGE_SIZE = 200 * 2**20
+
+
+class StreamlitSession:
+    """
+    Headless browser session speaking Streamlit's websocket protocol. Like the frontend, it requests
+    script runs with the current widget states and reads the resulting messages until each run finishes.
+
+    """
+    def __init__(self, ws_url: str, timeout: float = 30.0):
+        """
+        Initializes the session without connecting it.
+
+        Args:
+            ws_url (str): The websocket endpoint of the server, see StreamlitServer.ws_url.
+            timeout (float): Seconds allowed per script run. Defaults to 30.0.
+
+        """
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.widget_ids: Dict[str, str] = {}
+        self.widget_states: Dict[str, WidgetState] = {}
+        self.page_script_hash = ''
+        self._message_cache: Dict[str, ForwardMsg] = {}
+        self._connection: Optional[WebSocketClientConnection] = None
+
+    async def connect(self) -> 'StreamlitSession':
+        """
+        Opens the websocket connection, which creates a session on the server.
+
+        Returns:
+            StreamlitSession: The connected session.
+
+        """
+        self._connection = await asyncio.wait_for(
+            websocket_connect(self.ws_url, subprotocols=['streamlit'], max_message_size=MAX_MESSAGE_SIZE),
+            self.timeout
+        )
+        return self
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    def set_value(self, label: str, **value: Any) -> None:
+        """
+        Sets the value of a widget rendered by the previous script run, sent with the next run.
+
+        Args:
+            label (str): The widget label.
+            **value: The WidgetState value field, e.g. int_value=100 or string_value='sk-...'.
+
+        Raises:
+            LookupError: If no widget with this label was rendered.
+
+        """
+        if label not in self.widget_ids:
+            raise LookupError(f"No widget labelled '{label}' was rendered.")
+        self.widget_states[label] = WidgetState(id=self.widget_ids[label], **value)
+
+    def click(self, label: str) -> None:
+        """
+        Clicks a button or form submit button, which triggers it on the next run only.
+
+        Args:
+            label (str): The button label.
+
+        """
+        self.set_value(label, trigger_value=True)
+
+    def _resolve(self, payload: bytes) -> ForwardMsg:
+        """
+        Parses a message from the server, replacing references with the message they point to.
+        The server only sends references to messages that this session has already received.
+
+        Args:
+            payload (bytes): The serialized ForwardMsg.
+
+        Returns:
+            ForwardMsg: The parsed message.
+
+        """
+        msg = ForwardMsg()
+        msg.ParseFromString(payload)
+        if msg.WhichOneof('type') == 'ref_hash':
+            return self._message_cache[msg.ref_hash]
+        if msg.hash:
+            self._message_cache[msg.hash] = msg
+        return msg
+
+    async def run(self) -> int:
+        """
+        Requests a script run with the current widget states and waits for it to finish.
+
+        Returns:
+            int: The number of errors shown by the run, exceptions and error alerts included.
+
+        Raises:
+            asyncio.TimeoutError: If the run does not finish within the timeout.
+            ConnectionError: If the server closes the connection.
+
+        """
+        back_msg = BackMsg()
+        back_msg.rerun_script.page_script_hash = self.page_script_hash
+        back_msg.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        await self._connection.write_message(back_msg.SerializeToString(), binary=True)
+
+        # Triggers only last for the run they were sent with
+        self.widget_states = {label: state for label, state in self.widget_states.items() if not state.trigger_value}
+
+        errors = 0
+        deadline = time.monotonic() + self.timeout
+        while True:
+            payload = await asyncio.wait_for(self._connection.read_message(), max(deadline - time.monotonic(), 0))
+            if payload is None:
+                raise ConnectionError(f"Server closed the connection: {self._connection.close_reason}")
+
+            msg = self._resolve(payload)
+            msg_type = msg.WhichOneof('type')
+            if msg_type == 'navigation':
+                self.page_script_hash = msg.navigation.page_script_hash
+            elif msg_type == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                widget = getattr(element, element_type)
+                if getattr(widget, 'id', None) and getattr(widget, 'label', None):
+                    self.widget_ids[widget.label] = widget.id
+                if element_type == 'exception' or (element_type == 'alert' and widget.format == Alert.ERROR):
+                    errors += 1
+            elif msg_type == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors += 1
+                return errors
+
+    def close(self) -> None:
+        """
+        Closes the websocket connection, which ends the session on the server.
+
+        """
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+async def simulate_session(session: StreamlitSession, api_key: str, iterations: int) -> Dict[str, Any]:
+    """
+    Simulates one user on the API Usage page: an initial page load, followed by alternating
+    pricing form submissions and usage tracker lookups. The session is left connected so that
+    the memory it holds on the server can be measured.
+
+    Args:
+        session (StreamlitSession): The session to drive, connected if needed.
+        api_key (str): The API key entered in the usage tracker.
+        iterations (int): The number of pricing and tracker round trips.
+
+    Returns:
+        Dict[str, Any]: The script run times, the number of errors shown, and whether the session
+            failed, e.g. on a timeout or a missing widget, before completing its round trips.
+
+    """
+    run_times: List[float] = []
+    errors = 0
+
+    async def timed_run() -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        errors += await session.run()
+        run_times.append(time.perf_counter() - started)
+
+    try:
+        if not session.connected:
+            await session.connect()
+        await timed_run()
+
+        for iteration in range(iterations):
+            session.set_value("Input Tokens", int_value=100 * (iteration + 1))
+            session.set_value("Output Tokens", int_value=50 * (iteration + 1))
+            session.click("Check Usage Pricing")
+            await timed_run()
+
+            session.set_value("Visionary AI API Key", string_value=api_key)
+            session.click("Submit")
+            await timed_run()
+    except Exception as e:
+        logger.error(f"Session failed after {len(run_times)} script runs: {e!r}")
+        return {'run_times': run_times, 'errors': errors, 'failed': True}
+
+    return {'run_times': run_times, 'errors': errors, 'failed': False}
@@ -1,11 +1,12 @@
-import os, time
+import io, os, time, hashlib
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from backend.usage import (
-    retrieve_model_info, calculate_model_pricing, retrieve_key_usage_details
+    retrieve_model_info, calculate_model_pricing, retrieve_key_usage_details, export_usage_logs,
+    UsageStatistics, KEY_USAGE_TTL
 )
-from utils import Logger
+from utils import Logger, shared_cache
 
 
 # Initialize logging
@@ -118,7 +119,10 @@ with tab2_usage_tracker:
         )
     with col2:
         submitted_tracker = st.button("Submit", type='secondary', use_container_width=True, help="Track API Usage")
-    st.caption("_Note:_ Your API key is not stored on our website in any form. For transparency, please ensure it is deleted after use.")
+    if shared_cache.caches_sensitive:
+        st.caption(f"_Note:_ Your API key is not stored on our website. To reduce load, the usage details retrieved for it are cached on our server's disk for up to {KEY_USAGE_TTL} seconds, under a keyed hash of the API key. For transparency, please ensure it is deleted after use.")
+    else:
+        st.caption("_Note:_ Your API key is not stored on our website in any form. For transparency, please ensure it is deleted after use.")
     
     # Create placeholder to store results
     tc_status_placeholder = st.empty()
@@ -142,6 +146,9 @@ with tab2_usage_tracker:
                 st.session_state['key_usage'] = key_usage
                 st.session_state['usage_logs'] = usage_logs
                 st.session_state['tracker_error'] = None
+                st.session_state['tracker_key_id'] = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+                st.session_state['usage_export'] = None
+                st.session_state['export_error'] = None
             except:
                 st.session_state['tracker_error'] = "Unable to calculate token usage. Please verify that the API Key is entered correctly."
                 logger.warning(st.session_state['tracker_error'])
@@ -217,6 +224,109 @@ with tab2_usage_tracker:
                             )
                         }
                     )
+                    
+                    # Export usage history for offline reporting, built only when requested
+                    if len(usage_log_details) >= 1:
+                        # Resume points are tracked per API key, so that exports of different keys do not filter each other
+                        last_exported_at = st.session_state['last_exported_at'].get(st.session_state['tracker_key_id'])
+                        ex_col1, ex_col2, ex_col3 = st.columns([0.6, 0.2, 0.2], vertical_alignment='center')
+                        with ex_col1:
+                            export_new_only = st.checkbox(
+                                label="Only export records created since the last export",
+                                value=False,
+                                disabled=last_exported_at is None,
+                                help="Records created in the same second as the last exported record are included again, so drop duplicates when combining exports."
+                            )
+                        with ex_col2:
+                            export_format = st.selectbox(
+                                label="Export Format",
+                                options=['parquet', 'csv'],
+                                format_func=lambda option: "Parquet" if option == 'parquet' else "CSV (gzip)",
+                                label_visibility='collapsed'
+                            )
+                        with ex_col3:
+                            submitted_export = st.button("Prepare Export", type='secondary', use_container_width=True)
+                        
+                        if submitted_export:
+                            export_since = last_exported_at if export_new_only else None
+                            export_buffer = io.BytesIO()
+                            try:
+                                exported_records = export_usage_logs(
+                                    usage_log_details, export_buffer, file_format=export_format, since=export_since
+                                )
+                                st.session_state['usage_export'] = {
+                                    'file_format': export_format,
+                                    'data': export_buffer.getvalue(),
+                                    'records': exported_records,
+                                    'key_id': st.session_state['tracker_key_id'],
+                                    'last_created_at': max(log['created_at'] for log in usage_log_details)
+                                }
+                                st.session_state['export_error'] = None
+                            except Exception as e:
+                                st.session_state['usage_export'] = None
+                                st.session_state['export_error'] = "Unable to export usage history. Please contact the administrator to report this issue."
+                                logger.error(f"{st.session_state['export_error']} {e}")
+                        
+                        if st.session_state['export_error']:
+                            st.error(st.session_state['export_error'], icon=':material/error:')
+                        
+                        elif st.session_state['usage_export']:
+                            usage_export = st.session_state['usage_export']
+                            
+                            def mark_exported():
+                                st.session_state['last_exported_at'][usage_export['key_id']] = usage_export['last_created_at']
+                            
+                            is_parquet = usage_export['file_format'] == 'parquet'
+                            st.download_button(
+                                label=f"Download {usage_export['records']} Records",
+                                data=usage_export['data'],
+                                file_name='usage_logs.parquet' if is_parquet else 'usage_logs.csv.gz',
+                                mime='application/octet-stream' if is_parquet else 'application/gzip',
+                                on_click=mark_exported
+                            )
+                
+                with st.expander("Response Time Statistics", expanded=False, icon=':material/speed:'):
+                    usage_statistics = UsageStatistics()
+                    usage_statistics.ingest(sorted(usage_log_details, key=lambda log: log['created_at']))
+                    
+                    drifting_models = usage_statistics.drifting_models()
+                    if drifting_models:
+                        st.warning(f"Recent response time is drifting above baseline for: {', '.join(drifting_models)}", icon=':material/warning:')
+                    
+                    # Same layout for the per-model and per-key statistics
+                    for group_label, group_field, group_summaries in (
+                        ("Model", 'model_name', usage_statistics.model_summaries()),
+                        ("API Key", 'token_name', usage_statistics.key_summaries())
+                    ):
+                        stats_df = pd.DataFrame(
+                            [
+                                {
+                                    group_label: summary[group_field],
+                                    "Requests": summary['requests'],
+                                    "P50 (s)": summary['p50'],
+                                    "P95 (s)": summary['p95'],
+                                    "P99 (s)": summary['p99'],
+                                    "Recent (s)": summary['recent_latency'],
+                                    "Throughput (tokens/s)": summary['mean_throughput'],
+                                    "Latency Drift": summary['drifting']
+                                }
+                                for summary in group_summaries
+                            ],
+                            columns=[group_label, "Requests", "P50 (s)", "P95 (s)", "P99 (s)", "Recent (s)", "Throughput (tokens/s)", "Latency Drift"]
+                        )
+                        st.caption(f"_Per {group_label}_")
+                        st.dataframe(
+                            stats_df,
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                "P50 (s)": st.column_config.NumberColumn(format="%.2f"),
+                                "P95 (s)": st.column_config.NumberColumn(format="%.2f"),
+                                "P99 (s)": st.column_config.NumberColumn(format="%.2f"),
+                                "Recent (s)": st.column_config.NumberColumn(format="%.2f"),
+                                "Throughput (tokens/s)": st.column_config.NumberColumn(format="%.2f")
+                            }
+                        )
         else:
             st.session_state['tracker_error'] = "Error calculating token usage. Please contact the administrator to report this issue."
             # Handle the tracker error on runtime
@@ -19,5 +19,17 @@ def init_session_state():
     if 'usage_logs' not in st.session_state:
         st.session_state['usage_logs'] = None
     
+    if 'tracker_key_id' not in st.session_state:
+        st.session_state['tracker_key_id'] = None
+    
+    if 'last_exported_at' not in st.session_state:
+        st.session_state['last_exported_at'] = {}
+    
+    if 'usage_export' not in st.session_state:
+        st.session_state['usage_export'] = None
+    
+    if 'export_error' not in st.session_state:
+        st.session_state['export_error'] = None
+    
     if 'tracker_error' not in st.session_state:
         st.session_state['tracker_error'] = None
\ No newline at end of file
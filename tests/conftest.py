@@ -0,0 +1,7 @@
+import os, sys
+
+
+# Make the top-level packages importable when pytest is run from any directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,100 @@
+import io, gzip, csv
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from backend.usage.export import export_usage_logs, read_last_exported_at, USAGE_LOG_SCHEMA
+
+
+def _records(count, start=1700000000):
+    return [
+        {
+            'created_at': start + i,
+            'token_name': 'key',
+            'model_name': f'model-{i % 3}',
+            'use_time': i % 7,
+            'prompt_tokens': 10 * i,
+            'completion_tokens': 5 * i,
+            'quota': 100 * i
+        }
+        for i in range(count)
+    ]
+
+
+def test_parquet_export_is_typed_and_chunked(tmp_path):
+    path = str(tmp_path / 'logs.parquet')
+
+    assert export_usage_logs(iter(_records(10)), path, chunk_size=3) == 10
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 4
+    table = parquet_file.read()
+    assert table.schema.field('use_time').type == pa.int32()
+    assert table.schema.field('created_at').type.tz == 'UTC'
+    assert table.column('total_costs').to_pylist()[1] == pytest.approx(100 * 2e-6)
+    assert read_last_exported_at(path) == 1700000009
+
+
+def test_resumed_parquet_export_refuses_to_overwrite_file(tmp_path):
+    path = str(tmp_path / 'logs.parquet')
+    export_usage_logs(_records(10), path)
+
+    with pytest.raises(FileExistsError):
+        export_usage_logs(_records(15), path, since=read_last_exported_at(path))
+    assert pq.read_table(path).num_rows == 10
+
+
+def test_resumed_parquet_export_adds_part_to_dataset_directory(tmp_path):
+    dataset = tmp_path / 'logs'
+    dataset.mkdir()
+
+    export_usage_logs(_records(10), str(dataset))
+    since = read_last_exported_at(str(dataset))
+    assert export_usage_logs(_records(15), str(dataset), since=since) == 6
+
+    assert sorted(p.name for p in dataset.iterdir()) == ['part-0.parquet', f'part-{since}.parquet']
+    table = pq.read_table(str(dataset), schema=USAGE_LOG_SCHEMA)
+    assert table.num_rows == 16
+    assert table.group_by(table.column_names).aggregate([]).num_rows == 15
+    assert read_last_exported_at(str(dataset)) == 1700000014
+
+
+def test_resumed_csv_export_appends(tmp_path):
+    path = str(tmp_path / 'logs.csv.gz')
+    export_usage_logs(_records(10), path, file_format='csv')
+
+    since = read_last_exported_at(path, file_format='csv')
+    assert export_usage_logs(_records(15), path, file_format='csv', since=since) == 6
+
+    with gzip.open(path, 'rt', newline='') as text_file:
+        rows = list(csv.DictReader(text_file))
+    assert len(rows) == 16
+    assert len({tuple(row.values()) for row in rows}) == 15
+    assert read_last_exported_at(path, file_format='csv') == 1700000014
+
+
+def test_resume_keeps_records_created_in_the_same_second(tmp_path):
+    path = str(tmp_path / 'logs.csv.gz')
+    exported = _records(3)
+    export_usage_logs(exported, path, file_format='csv')
+
+    # A record created in the last exported second, but after the previous snapshot was taken
+    late = dict(exported[-1], model_name='late-model')
+    since = read_last_exported_at(path, file_format='csv')
+    assert export_usage_logs(exported + [late], path, file_format='csv', since=since) == 2
+
+    with gzip.open(path, 'rt', newline='') as text_file:
+        assert 'late-model' in {row['model_name'] for row in csv.DictReader(text_file)}
+
+
+def test_export_to_file_object(tmp_path):
+    buffer = io.BytesIO()
+    assert export_usage_logs(_records(4), buffer, file_format='csv', since=1700000002) == 2
+
+    with gzip.open(io.BytesIO(buffer.getvalue()), 'rt', newline='') as text_file:
+        rows = list(csv.DictReader(text_file))
+    assert [row['use_time'] for row in rows] == ['2', '3']
+
+
+def test_unsupported_format_is_rejected():
+    with pytest.raises(ValueError):
+        export_usage_logs(_records(1), io.BytesIO(), file_format='xlsx')
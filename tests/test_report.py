@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timezone
+import pytest
+import pyarrow.parquet as pq
+from backend.usage import report
+
+
+def _write_jobs(tmp_path, jobs):
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps(jobs))
+    return str(path)
+
+
+def test_read_report_jobs_resolves_keys_and_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv('REPORT_TEST_KEY', 'sk-from-env')
+    jobs = report.read_report_jobs(_write_jobs(tmp_path, [
+        {'api_key': 'sk-inline', 'start_date': '2024-06-01', 'end_date': '2024-06-30'},
+        {'api_key_env': 'REPORT_TEST_KEY'}
+    ]))
+
+    assert jobs[0] == {'api_key': 'sk-inline', 'start_date': '2024-06-01', 'end_date': '2024-06-30'}
+    assert jobs[1]['api_key'] == 'sk-from-env'
+    assert jobs[1]['start_date'] == report.DEFAULT_START_DATE
+
+
+@pytest.mark.parametrize('jobs', [
+    {'api_key': 'sk-inline'},
+    ['sk-inline'],
+    [{'api_key_env': 'REPORT_TEST_MISSING'}],
+    [{'api_key': 'sk-inline', 'start_date': '06/01/2024'}],
+    [{'api_key': 'sk-inline', 'end_date': 20240630}],
+    [{'api_key': 'sk-inline', 'start_date': '2024-07-01', 'end_date': '2024-06-30'}]
+])
+def test_read_report_jobs_rejects_malformed_files(tmp_path, jobs):
+    with pytest.raises(ValueError):
+        report.read_report_jobs(_write_jobs(tmp_path, jobs))
+
+
+def test_generate_usage_report_raises_when_output_is_unwritable(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, 'retrieve_model_info', lambda: None)
+    monkeypatch.setattr(report, 'summarize_key_usage', lambda api_key, **kwargs: {'api_key': api_key, 'models': {}})
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+
+    with pytest.raises(OSError):
+        report.generate_usage_report([{'api_key': 'sk-inline'}], str(blocker / 'report.json'))
+
+
+def test_parquet_report_has_a_row_for_every_key(tmp_path, monkeypatch):
+    def fake_summary(api_key, **kwargs):
+        if api_key == 'sk-failing-key':
+            raise RuntimeError('upstream unavailable')
+        models = {'gpt-4o-mini': {'requests': 2, 'prompt_tokens': 10, 'completion_tokens': 5}} if api_key == 'sk-active-key' else {}
+        return {'api_key': api_key, 'start_date': kwargs['start_date'], 'end_date': kwargs['end_date'], 'models': models, 'elapsed_seconds': 0.0}
+
+    monkeypatch.setattr(report, 'retrieve_model_info', lambda: None)
+    monkeypatch.setattr(report, 'summarize_key_usage', fake_summary)
+    output_path = str(tmp_path / 'report.parquet')
+    jobs = [
+        {'api_key': api_key, 'start_date': '2024-06-01', 'end_date': '2024-06-30'}
+        for api_key in ('sk-active-key', 'sk-idle-key', 'sk-failing-key')
+    ]
+    report.generate_usage_report(jobs, output_path, report_format='parquet')
+
+    rows = pq.read_table(output_path).to_pylist()
+    assert [(row['model_name'], row['requests'], row['error']) for row in rows] == [
+        ('gpt-4o-mini', 2, None),
+        (None, None, None),
+        (None, None, 'upstream unavailable')
+    ]
+    assert rows[2]['api_key'] == 'sk-...-key'
+    assert rows[2]['start_date'] == '2024-06-01'
+
+
+MODEL_INFOS = {'data': [
+    {'model_name': 'model-a', 'quota_type': 0, 'model_ratio': 2, 'completion_ratio': 3},
+    {'model_name': 'model-b', 'quota_type': 0, 'model_ratio': 1, 'completion_ratio': 1}
+]}
+
+
+def _utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def _fake_key_usage_details(api_key, start_date, end_date):
+    records = [
+        # Just outside the UTC date range on either side
+        {'created_at': _utc(2024, 5, 31, 23, 59, 59), 'model_name': 'model-a', 'use_time': 1, 'prompt_tokens': 1000, 'completion_tokens': 1000, 'quota': 1000},
+        {'created_at': _utc(2024, 7, 1), 'model_name': 'model-b', 'use_time': 1, 'prompt_tokens': 1000, 'completion_tokens': 1000, 'quota': 1000},
+        # Inside the range, out of order
+        {'created_at': _utc(2024, 6, 30, 23, 59, 59), 'token_name': 'prod', 'model_name': 'model-a', 'use_time': 4, 'prompt_tokens': 200, 'completion_tokens': 20, 'quota': 300},
+        {'created_at': _utc(2024, 6, 1), 'token_name': 'prod', 'model_name': 'model-a', 'use_time': 2, 'prompt_tokens': 100, 'completion_tokens': 10, 'quota': 200},
+        {'created_at': _utc(2024, 6, 15), 'token_name': 'dev', 'model_name': 'model-b', 'use_time': 1, 'prompt_tokens': 50, 'completion_tokens': 50, 'quota': 100}
+    ]
+    return {'soft_limit_usd': 100.0}, {'total_usage': 1234.5}, {'success': True, 'data': records}
+
+
+def test_summarize_key_usage_filters_and_prices_per_model(monkeypatch):
+    monkeypatch.setattr(report, 'retrieve_key_usage_details', _fake_key_usage_details)
+    summary = report.summarize_key_usage('sk-summary-key', '2024-06-01', '2024-06-30', model_infos=MODEL_INFOS)
+
+    assert summary['api_key'] == 'sk-...-key'
+    assert summary['token_names'] == ['dev', 'prod']
+    assert (summary['total_limit'], summary['total_usage']) == (100.0, 12.345)
+    assert (summary['requests'], summary['prompt_tokens'], summary['completion_tokens']) == (3, 350, 80)
+
+    model_a, model_b = summary['models']['model-a'], summary['models']['model-b']
+    assert (model_a['requests'], model_a['prompt_tokens'], model_a['completion_tokens']) == (2, 300, 30)
+    assert model_a['billed_cost'] == pytest.approx(500 * 2e-6)
+    assert model_a['estimated_cost'] == pytest.approx(0.49 * 2 * (300 + 30 * 3) / 500000)
+    assert model_b['estimated_cost'] == pytest.approx(0.49 * 1 * (50 + 50 * 1) / 500000)
+    assert summary['billed_cost'] == pytest.approx(600 * 2e-6)
+    assert summary['estimated_cost'] == pytest.approx(model_a['estimated_cost'] + model_b['estimated_cost'])
+    assert (model_a['p50_response_time'], model_b['p95_response_time']) == (pytest.approx(2, rel=0.02), pytest.approx(1, rel=0.02))
+    assert 0 <= summary['fetch_seconds'] <= summary['elapsed_seconds']
+
+
+@pytest.mark.parametrize('report_format', report.REPORT_FORMATS)
+def test_generate_usage_report_writes_key_summaries(tmp_path, monkeypatch, report_format):
+    monkeypatch.setattr(report, 'retrieve_key_usage_details', _fake_key_usage_details)
+    monkeypatch.setattr(report, 'retrieve_model_info', lambda: MODEL_INFOS)
+    output_path = str(tmp_path / f'report.{report_format}')
+    summaries = report.generate_usage_report(
+        [{'api_key': 'sk-summary-key', 'start_date': '2024-06-01', 'end_date': '2024-06-30'}],
+        output_path, report_format=report_format
+    )
+
+    if report_format == 'json':
+        with open(output_path) as json_file:
+            assert json.load(json_file) == summaries
+    else:
+        rows = pq.read_table(output_path).to_pylist()
+        assert [(row['model_name'], row['requests'], row['prompt_tokens']) for row in rows] == [('model-a', 2, 300), ('model-b', 1, 50)]
+        assert rows[0]['estimated_cost'] == pytest.approx(summaries[0]['models']['model-a']['estimated_cost'])
+        assert rows[0]['total_usage'] == 12.345
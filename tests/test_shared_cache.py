@@ -0,0 +1,124 @@
+import os, time, sqlite3, hashlib, multiprocessing
+import pytest
+from utils.shared_cache import SharedCache, SHARED_CACHE_PATH_ENV, SHARED_CACHE_LEASE_TIMEOUT_ENV
+
+
+def _fetch_through_cache(db_path, counter_path, barrier, default_lease_timeout=30.0, lease_timeout=None):
+    """
+    Worker process: waits for every worker, then fetches the same slow value through the shared cache.
+    Each upstream fetch appends a line to the counter file.
+
+    """
+    cache = SharedCache(db_path=db_path, secret='test-secret', lease_timeout=default_lease_timeout, poll_interval=0.02)
+
+    @cache.cached(namespace='slow', ttl=60, hash_args=True, lease_timeout=lease_timeout)
+    def slow_fetch(api_key):
+        with open(counter_path, 'a') as counter_file:
+            counter_file.write(f'{os.getpid()}\n')
+        time.sleep(0.5)
+        return {'api_key_length': len(api_key)}
+
+    barrier.wait()
+    return slow_fetch('sk-secret-key')
+
+
+@pytest.mark.parametrize('default_lease_timeout, lease_timeout', [
+    (30.0, None),
+    # The fetch outlasts the default lease, so waiters only hold off because of the per-function lease timeout
+    (0.1, 5.0)
+])
+def test_concurrent_processes_fetch_once(tmp_path, default_lease_timeout, lease_timeout):
+    db_path, counter_path = str(tmp_path / 'cache.db'), str(tmp_path / 'fetches.txt')
+    SharedCache(db_path=db_path)
+    context = multiprocessing.get_context('fork')
+    barrier = context.Manager().Barrier(6)
+
+    with context.Pool(6) as pool:
+        results = pool.starmap(
+            _fetch_through_cache, [(db_path, counter_path, barrier, default_lease_timeout, lease_timeout)] * 6
+        )
+
+    assert results == [{'api_key_length': 13}] * 6
+    with open(counter_path) as counter_file:
+        assert len(counter_file.readlines()) == 1
+
+
+def test_lease_timeout_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv(SHARED_CACHE_PATH_ENV, str(tmp_path / 'cache.db'))
+    monkeypatch.setenv(SHARED_CACHE_LEASE_TIMEOUT_ENV, '240')
+    cache = SharedCache.from_env()
+
+    assert cache.lease_timeout == 240.0
+    assert cache.busy_timeout == 5.0
+
+
+def test_abandoned_lease_is_taken_over(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    crashed = SharedCache(db_path=db_path, lease_timeout=0.3)
+    assert crashed._acquire_lease('key', crashed.lease_timeout)
+
+    waiting = SharedCache(db_path=db_path, lease_timeout=0.3, poll_interval=0.02)
+    started = time.monotonic()
+    assert waiting.get_or_compute('key', lambda: 'fresh', ttl=60) == 'fresh'
+    assert time.monotonic() - started >= 0.25
+    assert waiting.get('key') == (True, 'fresh')
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = SharedCache(db_path=str(tmp_path / 'cache.db'))
+    cache.set('key', {'value': 1}, ttl=0.2)
+    assert cache.get('key') == (True, {'value': 1})
+
+    time.sleep(0.3)
+    assert cache.get('key') == (False, None)
+    assert cache.get_or_compute('key', lambda: {'value': 2}, ttl=60) == {'value': 2}
+
+
+def test_none_results_are_not_cached(tmp_path):
+    cache = SharedCache(db_path=str(tmp_path / 'cache.db'))
+    calls = []
+
+    @cache.cached(namespace='flaky', ttl=60)
+    def flaky():
+        calls.append(1)
+        return None if len(calls) == 1 else 'ok'
+
+    assert flaky() is None
+    assert flaky() == 'ok'
+    assert flaky() == 'ok'
+    assert len(calls) == 2
+
+
+def test_sensitive_arguments_are_keyed_with_hmac(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    cache = SharedCache(db_path=db_path, secret='test-secret')
+    cache.cached(namespace='usage', ttl=60, hash_args=True)(lambda api_key: 'usage')('sk-secret-key')
+
+    with sqlite3.connect(db_path) as conn:
+        keys = [row[0] for row in conn.execute('SELECT key FROM entries')]
+    assert len(keys) == 1
+    assert 'sk-secret-key' not in keys[0]
+    assert hashlib.sha256(b'[["sk-secret-key"], {}]').hexdigest() not in keys[0]
+
+
+def test_sensitive_arguments_are_not_cached_without_secret(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    cache = SharedCache(db_path=db_path)
+    calls = []
+
+    @cache.cached(namespace='usage', ttl=60, hash_args=True)
+    def usage(api_key):
+        calls.append(api_key)
+        return 'usage'
+
+    assert usage('sk-secret-key') == usage('sk-secret-key') == 'usage'
+    assert len(calls) == 2
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 0
+
+
+def test_disabled_cache_passes_through():
+    cache = SharedCache()
+    assert not cache.enabled
+    assert cache.get_or_compute('key', lambda: 'value', ttl=60) == 'value'
+    assert cache.get('key') == (False, None)
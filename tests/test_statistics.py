@@ -0,0 +1,110 @@
+import random
+import pytest
+from backend.usage.statistics import QuantileSketch, RunningStats, LatencyStats, UsageStatistics
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(1, 1) for _ in range(20000))
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_sketch_merge_matches_single_sketch():
+    values = [0, 0.5, 1, 2, 3, 5, 8, 13, 21, 34]
+    combined, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        combined.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.count == combined.count
+    assert [left.quantile(q) for q in (0.1, 0.5, 0.9)] == [combined.quantile(q) for q in (0.1, 0.5, 0.9)]
+
+
+def test_sketch_memory_is_bounded():
+    sketch = QuantileSketch(max_buckets=16)
+    for exponent in range(-20, 20):
+        sketch.add(2.0 ** exponent)
+
+    assert len(sketch.buckets) <= 16
+    assert sketch.count == 40
+    assert sketch.quantile(1.0) == pytest.approx(2.0 ** 19, rel=0.02)
+
+
+def test_running_stats_merge():
+    left, right, combined = RunningStats(), RunningStats(), RunningStats()
+    for value in (1, 2, 3):
+        left.add(value)
+        combined.add(value)
+    for value in (10, 20):
+        right.add(value)
+        combined.add(value)
+    left.merge(right)
+
+    assert left.mean == pytest.approx(combined.mean)
+    assert left.stddev == pytest.approx(combined.stddev)
+
+
+def test_sub_second_drift_is_flagged():
+    stats = LatencyStats()
+    for _ in range(50):
+        stats.add(0.2)
+    for _ in range(40):
+        stats.add(0.85)
+
+    assert stats.is_drifting()
+    assert not stats.is_drifting(min_baseline=1.0)
+
+
+def test_stable_latency_is_not_flagged():
+    stats = LatencyStats()
+    for i in range(100):
+        stats.add(2 + (i % 3) * 0.1)
+
+    assert not stats.is_drifting()
+    assert not stats.is_drifting(min_requests=1000)
+
+
+@pytest.mark.parametrize('sigma', [0.8, 1.0])
+def test_unchanged_skewed_latency_is_not_flagged(sigma):
+    flagged = 0
+    for seed in range(100):
+        rng = random.Random(seed)
+        stats = LatencyStats()
+        for _ in range(500):
+            stats.add(rng.lognormvariate(0, sigma))
+        flagged += stats.is_drifting()
+
+    assert flagged <= 5
+
+
+def test_shifted_skewed_latency_is_flagged():
+    rng = random.Random(0)
+    stats = LatencyStats()
+    for _ in range(440):
+        stats.add(rng.lognormvariate(0, 0.5))
+    for _ in range(60):
+        stats.add(3 * rng.lognormvariate(0, 0.5))
+
+    assert stats.is_drifting()
+
+
+def test_usage_statistics_groups_by_model_and_key():
+    usage_statistics = UsageStatistics()
+    ingested = usage_statistics.ingest([
+        {'model_name': 'a', 'token_name': 'k1', 'use_time': 2, 'completion_tokens': 20},
+        {'model_name': 'b', 'token_name': 'k1', 'use_time': 4, 'completion_tokens': 20},
+        {'model_name': 'a', 'token_name': 'k2', 'use_time': 1, 'completion_tokens': 10},
+        {'model_name': 'a', 'token_name': 'k2'}
+    ])
+
+    assert ingested == 3
+    assert [(s['model_name'], s['requests']) for s in usage_statistics.model_summaries()] == [('a', 2), ('b', 1)]
+    assert [(s['token_name'], s['requests']) for s in usage_statistics.key_summaries()] == [('k1', 2), ('k2', 1)]
+    assert usage_statistics.per_model['a'].throughput.mean == pytest.approx(10.0)
@@ -1,11 +1,14 @@
 import os
 from .json_handler import JSONHandler
 from .logger import Logger
+from .shared_cache import SharedCache, shared_cache
 
 
 __all__ = [
     'JSONHandler',
-    'Logger'
+    'Logger',
+    'SharedCache',
+    'shared_cache'
 ]
 
 # Get the package name based on the directory name
@@ -0,0 +1,367 @@
+import os, hmac, json, time, uuid, sqlite3, hashlib, threading, functools
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Tuple, Iterator
+from utils.logger import Logger
+
+
+# Initialize logging
+module_name = os.path.basename(__file__).split('.')[0]
+log = Logger(logger_name=module_name, log_level='info')
+logger = log.get_logger()
+
+# Path of the SQLite database shared by every server process, the cache is disabled if unset
+SHARED_CACHE_PATH_ENV = 'VISIONARY_SHARED_CACHE_PATH'
+
+# Per-deployment secret used to HMAC sensitive arguments such as API keys into cache keys
+SHARED_CACHE_SECRET_ENV = 'VISIONARY_SHARED_CACHE_SECRET'
+
+# Default seconds a process may spend fetching an entry before other processes take over its lease
+SHARED_CACHE_LEASE_TIMEOUT_ENV = 'VISIONARY_SHARED_CACHE_LEASE_TIMEOUT'
+
+
+class SharedCache:
+    """
+    Cross-process cache backed by a local SQLite database.
+
+    Entries are stored as JSON with an expiry time. Concurrent misses for the same key are coordinated
+    through a lease table, so that only one process fetches from upstream while the others wait for its result.
+    Waiting processes only fetch themselves once the lease has expired, so the lease timeout should exceed the
+    slowest expected upstream fetch, and can be set per decorated function.
+    When no database path is configured, the cache is disabled and every call goes straight to the wrapped function.
+    Results of functions called with sensitive arguments are only cached when a secret is configured, since their
+    cache keys are derived with an HMAC of that secret.
+
+    """
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        secret: Optional[str] = None,
+        lease_timeout: float = 30.0,
+        poll_interval: float = 0.1,
+        busy_timeout: float = 5.0
+    ):
+        """
+        Initializes the cache and creates its tables if needed.
+
+        Args:
+            db_path (Optional[str]): The path to the SQLite database file. Defaults to None (disabled).
+            secret (Optional[str]): The per-deployment secret keying the HMAC of sensitive arguments. Defaults to None.
+            lease_timeout (float): Default seconds after which an unfinished fetch is considered abandoned
+                and taken over by a waiting process. Defaults to 30.0.
+            poll_interval (float): Seconds between checks while waiting for another process. Defaults to 0.1.
+            busy_timeout (float): Seconds to wait for the database lock held by another process. Defaults to 5.0.
+
+        """
+        self.db_path = db_path
+        self._secret = secret.encode('utf-8') if secret else None
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.busy_timeout = busy_timeout
+        self._owner = uuid.uuid4().hex
+        self._local = threading.local()
+
+        if self.enabled:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                with self._transaction() as conn:
+                    conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+                    conn.execute('CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)')
+                # Processes forked after import must not inherit an open connection
+                self.close()
+                logger.info(f"Shared cache initialized at {db_path}.")
+                if self._secret is None:
+                    logger.warning(f"{SHARED_CACHE_SECRET_ENV} is not set, results for sensitive arguments will not be cached.")
+            except sqlite3.Error as e:
+                logger.error(f"Unable to initialize shared cache at {db_path}, caching is disabled: {e}")
+                self.db_path = None
+
+    @classmethod
+    def from_env(cls) -> 'SharedCache':
+        """
+        Creates a cache using the database path, secret and default lease timeout from the VISIONARY_SHARED_CACHE_PATH,
+        VISIONARY_SHARED_CACHE_SECRET and VISIONARY_SHARED_CACHE_LEASE_TIMEOUT environment variables.
+
+        Returns:
+            SharedCache: The configured cache, disabled if the path is not set.
+
+        """
+        lease_timeout = os.getenv(SHARED_CACHE_LEASE_TIMEOUT_ENV)
+        return cls(
+            db_path=os.getenv(SHARED_CACHE_PATH_ENV) or None,
+            secret=os.getenv(SHARED_CACHE_SECRET_ENV) or None,
+            **({'lease_timeout': float(lease_timeout)} if lease_timeout else {})
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.db_path)
+
+    @property
+    def caches_sensitive(self) -> bool:
+        return self.enabled and self._secret is not None
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the SQLite connection of the current thread, opening it on first use. SQLite connections
+        cannot be used across fork(), so a forked process opens its own instead of reusing an inherited one.
+
+        Returns:
+            sqlite3.Connection: The connection in autocommit mode with WAL journaling.
+
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes the SQLite connection of the current thread, if it was opened by this process.
+        A new connection is opened on the next use.
+
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the enclosed statements in a write transaction, serialized across processes.
+
+        Yields:
+            sqlite3.Connection: The connection holding the transaction.
+
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up an unexpired entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and its value if so.
+
+        """
+        if not self.enabled:
+            return False, None
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM entries WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache read error: {e}")
+            return False, None
+        return (True, json.loads(row[0])) if row else (False, None)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Stores a JSON serializable value for ttl seconds, and purges expired entries.
+
+        Args:
+            key (str): The cache key.
+            value (Any): The value to store.
+            ttl (float): The time to live in seconds.
+
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), now + ttl)
+                )
+                conn.execute('DELETE FROM entries WHERE expires_at <= ?', (now,))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Shared cache write error: {e}")
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Removes a single entry, or every entry if no key is given.
+
+        Args:
+            key (Optional[str]): The cache key. Defaults to None.
+
+        """
+        if not self.enabled:
+            return
+        try:
+            with self._transaction() as conn:
+                if key is None:
+                    conn.execute('DELETE FROM entries')
+                else:
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache invalidation error: {e}")
+
+    def _acquire_lease(self, key: str, lease_timeout: float) -> bool:
+        """
+        Claims the right to compute key, taking over leases that have expired.
+
+        Args:
+            key (str): The cache key.
+            lease_timeout (float): Seconds the lease is held before other processes may take it over.
+
+        Returns:
+            bool: True if this process now holds the lease.
+
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM leases WHERE key = ? AND expires_at <= ?', (key, now))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)',
+                (key, self._owner, now + lease_timeout)
+            )
+            return cursor.rowcount == 1
+
+    def _release_lease(self, key: str) -> None:
+        """
+        Releases the lease on key if it is held by this process.
+
+        Args:
+            key (str): The cache key.
+
+        """
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, self._owner))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: float, lease_timeout: Optional[float] = None) -> Any:
+        """
+        Returns the cached value for key, or computes and stores it. If another process is already
+        computing the same key, waits for its result until its lease expires, then takes the lease over.
+        None results are returned but never cached, so failed fetches are retried on the next call.
+
+        Args:
+            key (str): The cache key.
+            compute (Callable[[], Any]): The function producing the value on a miss.
+            ttl (float): The time to live of the computed value in seconds.
+            lease_timeout (Optional[float]): Seconds the computation may take before waiting processes take it over.
+                Defaults to the lease timeout of the cache.
+
+        Returns:
+            Any: The cached or computed value.
+
+        """
+        if not self.enabled:
+            return compute()
+
+        lease_timeout = lease_timeout or self.lease_timeout
+        while True:
+            hit, value = self.get(key)
+            if hit:
+                logger.debug(f"Shared cache hit for {key}.")
+                return value
+
+            try:
+                leased = self._acquire_lease(key, lease_timeout)
+            except sqlite3.Error as e:
+                logger.error(f"Shared cache lease error, computing without cache: {e}")
+                return compute()
+
+            if leased:
+                try:
+                    # Another process may have stored the value between the lookup and the lease
+                    hit, value = self.get(key)
+                    if hit:
+                        return value
+                    value = compute()
+                    if value is not None:
+                        self.set(key, value, ttl)
+                    return value
+                finally:
+                    try:
+                        self._release_lease(key)
+                    except sqlite3.Error as e:
+                        logger.error(f"Shared cache lease release error: {e}")
+
+            time.sleep(self.poll_interval)
+
+    def cached(
+        self,
+        namespace: str,
+        ttl: float,
+        hash_args: bool = False,
+        memory: bool = False,
+        lease_timeout: Optional[float] = None
+    ) -> Callable:
+        """
+        Decorator caching the JSON serializable result of a function in the shared cache.
+
+        Args:
+            namespace (str): The prefix of the cache keys, usually the function name.
+            ttl (float): The time to live of cached results in seconds.
+            hash_args (bool): Whether the call arguments are sensitive, e.g. API keys. They are then HMAC'd with the
+                deployment secret to form the key, and the results are not cached at all if no secret is configured.
+                Defaults to False.
+            memory (bool): Whether to also keep results in process memory for ttl seconds, which works
+                even when the shared cache is disabled. Meant for small results only. Defaults to False.
+            lease_timeout (Optional[float]): Seconds a call may take before other processes waiting for the same
+                result fetch it themselves. Set it above the slowest expected call. Defaults to the lease timeout of the cache.
+
+        Returns:
+            Callable: The decorator.
+
+        """
+        def decorator(func: Callable) -> Callable:
+            memory_entries = {}
+            memory_lock = threading.Lock()
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+                if hash_args:
+                    if not self.caches_sensitive:
+                        return func(*args, **kwargs)
+                    arguments = hmac.new(self._secret, arguments.encode('utf-8'), hashlib.sha256).hexdigest()
+                key = f'{namespace}:{arguments}'
+
+                if not memory:
+                    return self.get_or_compute(key, lambda: func(*args, **kwargs), ttl, lease_timeout)
+
+                with memory_lock:
+                    entry = memory_entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+                value = self.get_or_compute(key, lambda: func(*args, **kwargs), ttl, lease_timeout)
+                if value is not None:
+                    with memory_lock:
+                        memory_entries[key] = (time.monotonic() + ttl, value)
+                return value
+            return wrapper
+        return decorator
+
+
+# Shared instance configured from the environment
+shared_cache = SharedCache.from_env()
+
+
+# Example Usage
+if __name__ == "__main__":
+    cache = SharedCache(db_path='../cache/shared_cache.db')
+
+    @cache.cached(namespace='square', ttl=60)
+    def square(x: int) -> int:
+        print(f"Computing square of {x}...")
+        return x * x
+
+    print(square(4))   # Computed
+    print(square(4))   # Served from the shared cache
+    cache.invalidate()